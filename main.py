@@ -1,33 +1,52 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import re
-import time
-from datetime import date
+from datetime import date, timedelta
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-import pandas as pd
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import xlsxwriter
+from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
 
 
 # ===================== НАСТРОЙКИ =====================
 URL = "https://скдф.рф/traffic-accidents/"
+SITE_HOST = urlsplit(URL).hostname.encode("idna").decode()  # в ответах хост в punycode
 
 START_DATE = date(2024, 11, 1)
 END_DATE = date(2024, 11, 30)
 
-MAX_PAGES = 5
+MAX_PAGES_PER_PERIOD = 5  # лимит страниц на каждый подпериод (при упоре — [WARN] с периодом)
 PAGE_SIZE = "160"
 
-HEADLESS = False
+# Период режется на WORKERS подпериодов, каждый собирается в своём контексте браузера параллельно
+WORKERS = 4
+# Сколько контекстов открывается в одном Chromium, прежде чем ScraperPool его перезапустит
+BROWSER_MAX_USES = 50
+
+HEADLESS = True
 NAV_TIMEOUT_MS = 60_000
 ACTION_TIMEOUT_MS = 30_000
 WAIT_TABLE_CHANGE_MS = 30_000
 
+# Типы ресурсов, которые не нужны для работы с таблицей — их загрузку обрываем.
+# stylesheet не трогаем: без CSS ломается :visible у чекбоксов/выпадающих меню.
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# storage_state после настройки фильтров — на следующем запуске по нему пропускается настройка
+# (если сайт восстановил фильтры; иначе они выставляются заново)
+STATE_FILE = "skdf_state_{start:%Y-%m-%d}_{end:%Y-%m-%d}.json"
+
 OUT_CSV = "skdf_traffic_accidents_2024-11.csv"
 OUT_EXCEL = "skdf_traffic_accidents_2024-11.xlsx"
 
 # ===================== СЕЛЕКТОРЫ =====================
 SEL_TABLE = "table.table.skdf"
+SEL_TABLE_ROWS = f"{SEL_TABLE} tbody tr[data-index]"
 SEL_FIELDS_BTN = f"{SEL_TABLE} thead tr:first-child th:first-child button"
 
 SEL_LIMIT_BTN = "#limitTable"
@@ -37,6 +56,9 @@ SEL_NEXT_PAGE_BTN = "ul.pagination li.page-item:last-child button.page-link"
 
 RE_FILTERS_BTN = re.compile(r"Фильтры", re.I)
 RE_SHOW_BTN = re.compile(r"Показать", re.I)
+# Заглушка пустой таблицы — только она (а не просто пустой tbody во время перезагрузки)
+# означает, что данных за период нет
+RE_NO_DATA = re.compile(r"Нет данных|Ничего не найдено|Данные не найдены", re.I)
 
 SEL_PERIOD_ACCORDION_BTN = ".accordion-button:has-text('Период')"
 SEL_PERIOD_INPUT = "#ReactDatePicker"
@@ -46,162 +68,247 @@ SEL_CAL_PREV_BTN = f"{SEL_DATEPICKER_DIALOG} .react-datepicker__header button.bt
 SEL_CAL_NEXT_BTN = f"{SEL_DATEPICKER_DIALOG} .react-datepicker__header button.btn-icon.btn-skdf-function:last-child"
 
 # Плейсхолдеры месяца/года (их 2) — строгий режим ломался из-за wait_for() на "двух элементах".
-# Исправление: ждать ДИАЛОГ, а плейсхолдеры читать без wait_for() на коллекции.
+# Исправление: ждать один конкретный плейсхолдер (nth), а коллекцию читать без wait_for().
 SEL_CAL_PLACEHOLDERS = f"{SEL_DATEPICKER_DIALOG} .downshift__input__field__value_placeholder"
 
+# Ячейки дней текущего месяца (без "хвостов" соседних месяцев) — по дню месяца
+SEL_CAL_DAYS = {
+    d: (
+        f"{SEL_DATEPICKER_DIALOG} "
+        f".react-datepicker__day.react-datepicker__day--{d:03d}:not(.react-datepicker__day--outside-month)"
+    )
+    for d in range(1, 32)
+}
+
+SEL_CAL_FOCUS_DAY = f"{SEL_DATEPICKER_DIALOG} .react-datepicker__day[tabindex='0']"
+
+RE_NON_DIGITS = re.compile(r"\D+")
+
 
 MONTHS_RU = {
     1: "Январь", 2: "Февраль", 3: "Март", 4: "Апрель", 5: "Май", 6: "Июнь",
     7: "Июль", 8: "Август", 9: "Сентябрь", 10: "Октябрь", 11: "Ноябрь", 12: "Декабрь",
 }
+MONTHS_RU_REV = {v: k for k, v in MONTHS_RU.items()}
+
+
+# Данные копятся по столбцам: имя столбца -> значения (все списки одной длины)
+Columns = Dict[str, List[str]]
 
 
 def _txt(s: Optional[str]) -> str:
     return (s or "").replace("\xa0", " ").strip()
 
 
-def _month_name_ru(m: int) -> str:
-    return MONTHS_RU[m]
+def _num_rows(columns: Columns) -> int:
+    return len(next(iter(columns.values()), []))
+
+
+def _extend_columns(dst: Columns, src: Columns) -> None:
+    """Дописывает src в конец dst; недостающие с обеих сторон столбцы добиваются ""."""
+    n_dst, n_src = _num_rows(dst), _num_rows(src)
+    for name, values in src.items():
+        dst.setdefault(name, [""] * n_dst).extend(values)
+    total = n_dst + n_src
+    for values in dst.values():
+        if len(values) < total:
+            values.extend([""] * (total - len(values)))
+
+
+def _split_period(start: date, end: date, parts: int) -> List[Tuple[date, date]]:
+    """Режет [start, end] на непересекающиеся подпериоды — от новых к старым, как в таблице."""
+    days = (end - start).days + 1
+    parts = max(1, min(parts, days))
+    step, rest = divmod(days, parts)
+
+    chunks: List[Tuple[date, date]] = []
+    cur = start
+    for k in range(parts):
+        size = step + (1 if k < rest else 0)
+        chunks.append((cur, cur + timedelta(days=size - 1)))
+        cur += timedelta(days=size)
+    return chunks[::-1]
+
+
+async def _block_heavy_resources(route) -> None:
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
 
 # ===================== UI helpers =====================
-def open_filters(page) -> None:
-    page.get_by_role("button", name=RE_FILTERS_BTN).click()
+async def open_filters(page) -> None:
+    await page.get_by_role("button", name=RE_FILTERS_BTN).click()
 
 
-def click_select_all_fields(page) -> None:
-    page.locator(SEL_FIELDS_BTN).click()
+async def click_select_all_fields(page) -> None:
+    await page.locator(SEL_FIELDS_BTN).click()
     checkbox = page.locator("input[type='checkbox']:visible").first
-    checkbox.wait_for(state="visible")
+    await checkbox.wait_for(state="visible")
     try:
-        if not checkbox.is_checked():
-            checkbox.click(force=True)
+        if not await checkbox.is_checked():
+            await checkbox.click(force=True)
     except Exception:
-        checkbox.click(force=True)
-
-
-def set_page_size(page, page_size: str) -> None:
-    page.locator(SEL_LIMIT_BTN).click()
-    page.locator(SEL_LIMIT_MENU_ITEM, has_text=page_size).click()
-    page.wait_for_load_state("networkidle")
+        await checkbox.click(force=True)
+
+
+async def set_page_size(page, page_size: str) -> None:
+    await page.locator(SEL_LIMIT_BTN).click()
+    await page.locator(SEL_LIMIT_MENU_ITEM, has_text=page_size).click()
+    # кнопка показывает новый размер, а в таблице page_size строк (или меньше, но это последняя страница)
+    await _wait_table_ready(
+        page,
+        _JS_PAGE_SIZE_APPLIED,
+        _page_size_arg(page_size),
+        f"размер страницы {page_size}",
+    )
 
 
 # ===================== Calendar helpers =====================
-def _calendar_get_month_year(page) -> Tuple[str, int]:
+async def _calendar_get_month_year(page) -> Tuple[str, int]:
     """
     Исправление strict mode violation:
     - НЕ вызываем wait_for() на locator, который матчится на 2 элемента.
-    - Ждём сам диалог календаря, затем ждём ПЕРВЫЙ плейсхолдер (month),
-      а второй читаем как nth(1).
+    - Ждём ВТОРОЙ плейсхолдер (year) через nth(1) — он рендерится последним,
+      затем читаем оба одним вызовом.
     """
-    page.locator(SEL_DATEPICKER_DIALOG).wait_for(state="visible")
-
     placeholders = page.locator(SEL_CAL_PLACEHOLDERS)
-    placeholders.first.wait_for(state="visible")  # ждём только 1 элемент => strict ok
-
-    # На всякий: если второй ещё не успел дорендериться — подождём коротко
-    deadline = time.time() + 5
-    while time.time() < deadline and placeholders.count() < 2:
-        page.wait_for_timeout(100)
+    await placeholders.nth(1).wait_for(state="visible")  # ждём только 1 элемент => strict ok
 
-    month = _txt(placeholders.nth(0).inner_text())
-    year_txt = _txt(placeholders.nth(1).inner_text()) if placeholders.count() >= 2 else ""
+    texts = [_txt(t) for t in await placeholders.all_inner_texts()]
+    month = texts[0]
+    year_txt = texts[1] if len(texts) >= 2 else ""
 
     # year_txt обычно "2026"
-    year_digits = re.sub(r"\D+", "", year_txt)
+    year_digits = RE_NON_DIGITS.sub("", year_txt)
     if not year_digits:
         raise RuntimeError(f"Не смогли прочитать год из календаря: '{year_txt}'")
 
     return month, int(year_digits)
 
 
-def _navigate_calendar_to(page, target: date) -> None:
-    target_month = _month_name_ru(target.month)
-    target_year = target.year
+async def _calendar_delta_to(page, target: date) -> int:
+    """Сколько месяцев от открытого в календаре месяца до target (со знаком)."""
+    cur_month, cur_year = await _calendar_get_month_year(page)
 
-    for _ in range(0, 60):  # запас
-        cur_month, cur_year = _calendar_get_month_year(page)
+    cur_month_num = MONTHS_RU_REV.get(cur_month)
+    if cur_month_num is None:
+        raise RuntimeError(f"Неизвестный месяц в календаре: '{cur_month}' (проверь MONTHS_RU)")
 
-        # текущий месяц -> номер
-        cur_month_num = None
-        for k, v in MONTHS_RU.items():
-            if v == cur_month:
-                cur_month_num = k
-                break
-        if cur_month_num is None:
-            # если вдруг локаль/текст другой — попробуем просто идти назад
-            page.locator(SEL_CAL_PREV_BTN).click()
-            continue
+    return (target.year - cur_year) * 12 + (target.month - cur_month_num)
 
-        if (cur_year, cur_month_num) == (target_year, target.month):
-            return
 
-        if (cur_year, cur_month_num) < (target_year, target.month):
-            page.locator(SEL_CAL_NEXT_BTN).click()
-        else:
-            page.locator(SEL_CAL_PREV_BTN).click()
+async def _navigate_calendar_to(page, target: date) -> None:
+    # разница в месяцах считается сразу — без перечитывания заголовка после каждого шага
+    delta = await _calendar_delta_to(page, target)
+    if delta == 0:
+        return
 
-    raise RuntimeError("Не удалось перемотать календарь до нужного месяца/года.")
+    # react-datepicker: PageUp/PageDown на выбранном дне — месяц, Shift+PageUp/PageDown — год.
+    # Клавиши нажимаются на дне с tabindex=0 (его держит клавиатурная навигация).
+    day = page.locator(SEL_CAL_FOCUS_DAY).first
+    if await day.count():
+        key = "PageDown" if delta > 0 else "PageUp"
+        years, months = divmod(abs(delta), 12)
+        for _ in range(years):
+            await day.press(f"Shift+{key}")
+        for _ in range(months):
+            await day.press(key)
+        delta = await _calendar_delta_to(page, target)
 
+    # если клавиатура не сработала (или сработала не до конца) — добиваем кнопками
+    if delta:
+        btn = page.locator(SEL_CAL_NEXT_BTN if delta > 0 else SEL_CAL_PREV_BTN)
+        for _ in range(abs(delta)):
+            await btn.click()
+            await page.wait_for_timeout(40)
+        delta = await _calendar_delta_to(page, target)
 
-def _pick_day_in_current_month(page, day: int) -> None:
-    dd = f"{day:03d}"
-    sel = (
-        f"{SEL_DATEPICKER_DIALOG} "
-        f".react-datepicker__day.react-datepicker__day--{dd}:not(.react-datepicker__day--outside-month)"
-    )
-    cell = page.locator(sel).first
-    cell.wait_for(state="visible")
-    cell.click()
+    if delta:
+        raise RuntimeError("Не удалось перемотать календарь до нужного месяца/года.")
 
 
-def set_period_range_via_calendar(page, start: date, end: date) -> None:
-    open_filters(page)
+async def _pick_day_in_current_month(page, day: int) -> None:
+    cell = page.locator(SEL_CAL_DAYS[day]).first
+    await cell.wait_for(state="visible")
+    await cell.click()
+
+
+async def set_period_range_via_calendar(page, start: date, end: date) -> None:
+    await open_filters(page)
 
     # раскрыть аккордеон "Период"
-    page.locator(SEL_PERIOD_ACCORDION_BTN).first.wait_for(state="visible")
-    page.locator(SEL_PERIOD_ACCORDION_BTN).first.click()
+    await page.locator(SEL_PERIOD_ACCORDION_BTN).first.wait_for(state="visible")
+    await page.locator(SEL_PERIOD_ACCORDION_BTN).first.click()
 
     # открыть календарь кликом по input
-    page.locator(SEL_PERIOD_INPUT).wait_for(state="visible")
-    page.locator(SEL_PERIOD_INPUT).click()
+    await page.locator(SEL_PERIOD_INPUT).wait_for(state="visible")
+    await page.locator(SEL_PERIOD_INPUT).click()
 
     # дождаться календаря
-    page.locator(SEL_DATEPICKER_DIALOG).wait_for(state="visible")
+    await page.locator(SEL_DATEPICKER_DIALOG).wait_for(state="visible")
 
     # выбрать старт
-    _navigate_calendar_to(page, start)
-    _pick_day_in_current_month(page, start.day)
+    await _navigate_calendar_to(page, start)
+    await _pick_day_in_current_month(page, start.day)
 
     # выбрать конец
-    _navigate_calendar_to(page, end)
-    _pick_day_in_current_month(page, end.day)
+    await _navigate_calendar_to(page, end)
+    await _pick_day_in_current_month(page, end.day)
 
-    # нажать "Показать ..."
+    # нажать "Показать ..." и дождаться ответа с данными таблицы — иначе проверка строк
+    # ниже могла бы пройти на ещё не отфильтрованной таблице
+    what = f"период {start:%d.%m.%Y}-{end:%d.%m.%Y}"
     try:
-        page.get_by_role("button", name=RE_SHOW_BTN).click()
+        async with page.expect_response(_is_table_data_response, timeout=WAIT_TABLE_CHANGE_MS) as resp_info:
+            try:
+                await page.get_by_role("button", name=RE_SHOW_BTN).click()
+            except PWTimeoutError:
+                await page.locator("text=/Показать/i").first.click()
+        await resp_info.value
     except PWTimeoutError:
-        page.locator("text=/Показать/i").first.click()
+        raise RuntimeError(f"Нет ответа с данными таблицы после настройки: {what}") from None
 
-    page.wait_for_load_state("networkidle")
+    # первая и последняя строки таблицы попадают в период (или показана заглушка "нет данных")
+    await _wait_table_ready(page, _JS_ROWS_IN_PERIOD, _rows_in_period_arg(start, end), what)
 
 
 # ===================== Table / paging =====================
-def parse_table(page) -> List[Dict[str, str]]:
-    table = page.locator(SEL_TABLE)
-    table.wait_for(state="visible")
-
-    thead_rows = table.locator("thead tr")
-    row1 = thead_rows.nth(0).locator("th")
-    row2 = thead_rows.nth(1).locator("th") if thead_rows.count() > 1 else None
-
-    headers_row1 = [_txt(row1.nth(i).inner_text()) for i in range(row1.count())]
+def _cache_locators(page) -> None:
+    """Локаторы таблицы и пагинации создаются один раз на страницу и живут в page._skdf."""
+    page._skdf = {
+        "table": page.locator(SEL_TABLE),
+        "rows": page.locator(SEL_TABLE_ROWS),
+        "next_btn": page.locator(SEL_NEXT_PAGE_BTN),
+    }
+
+
+# Вся таблица одним вызовом: обе строки заголовка + ячейки тела
+_JS_TABLE_DATA = """tbl => {
+    const texts = els => [...els].map(e => e.innerText);
+    const head = tbl.querySelectorAll('thead tr');
+    return {
+        h1: head.length > 0 ? texts(head[0].querySelectorAll('th')) : [],
+        h2: head.length > 1 ? texts(head[1].querySelectorAll('th')) : [],
+        rows: [...tbl.querySelectorAll('tbody tr[data-index]')].map(r => texts(r.querySelectorAll('td'))),
+    };
+}"""
+
+
+async def parse_table(page) -> Columns:
+    table = page._skdf["table"]
+    await table.wait_for(state="visible")
+
+    data = await table.evaluate(_JS_TABLE_DATA)
+
+    headers_row1 = [_txt(t) for t in data["h1"]]
     if headers_row1:
         headers_row1[0] = ""  # служебный
 
-    sub = []
-    if row2 is not None and row2.count() >= 2:
-        sub = [_txt(row2.nth(i).inner_text()) for i in range(row2.count())]
+    sub = [_txt(t) for t in data["h2"]]
+    if len(sub) < 2:
+        sub = []
 
     final_headers: List[str] = []
     i = 0
@@ -218,112 +325,360 @@ def parse_table(page) -> List[Dict[str, str]]:
         final_headers.append(h)
         i += 1
 
-    rows = table.locator("tbody tr[data-index]")
-    out: List[Dict[str, str]] = []
+    raw_rows: List[List[str]] = data["rows"]
 
-    for r in range(rows.count()):
-        tr = rows.nth(r)
-        tds = tr.locator("td")
-        values = [_txt(tds.nth(i).inner_text()) for i in range(tds.count())]
+    columns: Columns = {h: [] for h in final_headers}
+    names = list(final_headers)
+    positions = {h: k for k, h in enumerate(names)}  # при повторе заголовка берём последнюю ячейку
 
-        if len(values) < len(final_headers):
-            values += [""] * (len(final_headers) - len(values))
-        elif len(values) > len(final_headers):
-            extras = [f"extra_{k}" for k in range(1, len(values) - len(final_headers) + 1)]
-            headers = final_headers + extras
-            out.append(dict(zip(headers, values)))
-            continue
+    for n, raw in enumerate(raw_rows):
+        values = [_txt(t) for t in raw]
+
+        if len(values) > len(names):
+            for k in range(len(names) - len(final_headers) + 1, len(values) - len(final_headers) + 1):
+                name = f"extra_{k}"
+                names.append(name)
+                positions[name] = len(names) - 1
+                columns[name] = [""] * n
+        elif len(values) < len(names):
+            values += [""] * (len(names) - len(values))
 
-        out.append(dict(zip(final_headers, values)))
+        for name, k in positions.items():
+            columns[name].append(values[k])
 
-    return out
+    return columns
 
 
-def first_row_signature(page) -> str:
-    table = page.locator(SEL_TABLE)
-    first = table.locator("tbody tr[data-index]").first
-    if first.count() == 0:
+async def first_row_signature(page) -> str:
+    first = page._skdf["rows"].first
+    if await first.count() == 0:
         return ""
-    return _txt(first.inner_text())
+    return _txt(await first.inner_text())
+
+
+# Предикаты выполняются внутри страницы — ожидание без опроса из Python.
+# Таблица "перерисовалась", если сменилась первая строка. \u00a0 заменяем так же, как _txt().
+_JS_ROWS_CHANGED = """([sel, prevSig]) => {
+    const rows = document.querySelectorAll(sel);
+    if (!rows.length) return false;
+    const sig = rows[0].innerText.replace(/\\u00a0/g, ' ').trim();
+    return !!sig && sig !== prevSig;
+}"""
+
+# Кнопка "следующая страница" неактивна: disabled у самой кнопки или Bootstrap-класс у li.
+# Общая проверка для has_next_page() и ожидания размера страницы.
+_JS_NEXT_DISABLED = "btn => btn.disabled || btn.closest('li.disabled') !== null"
+
+# Таблица показывает заглушку "нет данных" (ищем в контейнере таблицы)
+_JS_NO_DATA = """(tableSel, pattern) => {
+    const tbl = document.querySelector(tableSel);
+    const host = tbl ? (tbl.parentElement || tbl) : null;
+    return !!host && new RegExp(pattern, 'i').test(host.innerText);
+}"""
+
+# Размер страницы применён: кнопка #limitTable показывает его, и строк ровно столько —
+# либо меньше, но тогда следующей страницы нет. Ноль строк — только вместе с заглушкой.
+_JS_PAGE_SIZE_APPLIED = """([limitSel, rowsSel, nextSel, size, tableSel, noData]) => {
+    const isDisabled = """ + _JS_NEXT_DISABLED + """;
+    const hasNoData = """ + _JS_NO_DATA + """;
+    const limit = document.querySelector(limitSel);
+    if (!limit || !limit.innerText.split(/\\s+/).includes(String(size))) return false;
+    const rows = document.querySelectorAll(rowsSel).length;
+    if (rows >= size) return true;
+    if (!rows) return hasNoData(tableSel, noData);
+    const next = document.querySelector(nextSel);
+    return !next || isDisabled(next);
+}"""
+
+# Период применён: даты в первой и последней строках (таблица от новых к старым) лежат
+# в [start, end]; пустая таблица — только с заглушкой. Даты сравниваются как строки YYYYMMDD.
+# Сам по себе не доказывает, что фильтр сработал (без фильтра таблица тоже начинается
+# со свежих ДТП), поэтому после "Показать" проверяется только вслед за ответом с данными.
+_JS_ROWS_IN_PERIOD = """([rowsSel, start, end, tableSel, noData]) => {
+    const hasNoData = """ + _JS_NO_DATA + """;
+    const rows = document.querySelectorAll(rowsSel);
+    if (!rows.length) return hasNoData(tableSel, noData);
+    return [rows[0], rows[rows.length - 1]].every(r => {
+        const m = r.innerText.match(/\\b(\\d{2})\\.(\\d{2})\\.(\\d{4})\\b/);
+        if (!m) return false;
+        const d = m[3] + m[2] + m[1];
+        return start <= d && d <= end;
+    });
+}"""
+
+
+def _page_size_arg(page_size: str) -> list:
+    return [SEL_LIMIT_BTN, SEL_TABLE_ROWS, SEL_NEXT_PAGE_BTN, int(page_size), SEL_TABLE, RE_NO_DATA.pattern]
+
+
+def _rows_in_period_arg(start: date, end: date) -> list:
+    return [SEL_TABLE_ROWS, f"{start:%Y%m%d}", f"{end:%Y%m%d}", SEL_TABLE, RE_NO_DATA.pattern]
+
+
+def _is_table_data_response(response) -> bool:
+    """JSON-ответ XHR/fetch с домена СКДФ — запрос данных таблицы (аналитика и статика не подходят)."""
+    if response.request.resource_type not in ("xhr", "fetch"):
+        return False
+    host = urlsplit(response.url).hostname or ""
+    if host != SITE_HOST and not host.endswith("." + SITE_HOST):
+        return False
+    return "json" in response.headers.get("content-type", "")
 
 
-def wait_table_changed(page, prev_sig: str, timeout_ms: int) -> bool:
-    deadline = time.time() + timeout_ms / 1000
-    while time.time() < deadline:
-        page.wait_for_timeout(200)
-        cur = first_row_signature(page)
-        if cur and cur != prev_sig:
-            return True
-    return False
+async def _wait_table_ready(page, js: str, arg: list, what: str) -> None:
+    try:
+        await page.wait_for_function(js, arg=arg, timeout=WAIT_TABLE_CHANGE_MS)
+    except PWTimeoutError:
+        raise RuntimeError(f"Таблица не обновилась после настройки: {what}") from None
 
 
-def next_page(page) -> bool:
-    btn = page.locator(SEL_NEXT_PAGE_BTN)
-    if btn.count() == 0:
-        return False
+async def wait_table_changed(page, prev_sig: str, timeout_ms: int) -> bool:
     try:
-        if not btn.is_enabled():
-            return False
-    except Exception:
-        pass
+        await page.wait_for_function(
+            _JS_ROWS_CHANGED,
+            arg=[SEL_TABLE_ROWS, prev_sig],
+            timeout=timeout_ms,
+        )
+    except PWTimeoutError:
+        return False
+    return True
 
-    prev = first_row_signature(page)
-    btn.click()
 
-    changed = wait_table_changed(page, prev, WAIT_TABLE_CHANGE_MS)
-    page.wait_for_load_state("networkidle")
-    return changed
+async def has_next_page(page) -> bool:
+    btn = page._skdf["next_btn"]
+    if await btn.count() == 0:
+        return False
+    return not await btn.evaluate(_JS_NEXT_DISABLED)
 
 
-# ===================== main =====================
-def main() -> None:
-    all_rows: List[Dict[str, str]] = []
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=HEADLESS)
-        context = browser.new_context(
-            viewport={"width": 1440, "height": 900},
-            locale="ru-RU",
-        )
-        page = context.new_page()
-        page.set_default_navigation_timeout(NAV_TIMEOUT_MS)
-        page.set_default_timeout(ACTION_TIMEOUT_MS)
+async def next_page(page) -> bool:
+    if not await has_next_page(page):
+        return False
 
-        page.goto(URL, wait_until="domcontentloaded")
-        page.wait_for_load_state("networkidle")
+    btn = page._skdf["next_btn"]
+    prev = await first_row_signature(page)
+    await btn.click()
 
-        # 1) Выбор всех полей
-        click_select_all_fields(page)
+    return await wait_table_changed(page, prev, WAIT_TABLE_CHANGE_MS)
 
-        # 2) Период через календарь (исправлено)
-        set_period_range_via_calendar(page, START_DATE, END_DATE)
 
-        # 3) Показывать по -> 160
-        set_page_size(page, PAGE_SIZE)
+# ===================== Output =====================
+def _write_csv(table: pa.Table, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write("\ufeff".encode("utf-8"))  # BOM, как у utf-8-sig — чтобы Excel открыл кириллицу
+        pa_csv.write_csv(table, f)
 
-        # 4) Сбор страниц
-        for pg in range(1, MAX_PAGES + 1):
-            rows = parse_table(page)
-            for r in rows:
-                r["_page"] = str(pg)
-            all_rows.extend(rows)
 
-            print(f"[OK] page {pg}: +{len(rows)} rows (total={len(all_rows)})")
+def _write_excel(table: pa.Table, path: str) -> None:
+    # constant_memory: строки сбрасываются на диск по мере записи, без модели всей книги в памяти.
+    # strings_to_*: значения пишутся как есть — без превращения "http..." в ссылки
+    # (длинные URL xlsxwriter молча выбрасывает) и "=..." в формулы.
+    wb = xlsxwriter.Workbook(
+        path,
+        {"constant_memory": True, "strings_to_urls": False, "strings_to_formulas": False},
+    )
+    try:
+        ws = wb.add_worksheet()
+        ws.write_row(0, 0, table.column_names)
+        for i, row in enumerate(zip(*(col.to_pylist() for col in table.columns)), start=1):
+            ws.write_row(i, 0, row)
+    finally:
+        wb.close()
+
+
+# ===================== Warm start =====================
+async def _period_applied(page, start: date, end: date) -> bool:
+    """Поле периода в фильтре уже содержит обе даты (строки таблицы для этого не годятся:
+    без фильтра таблица тоже начинается с самых свежих ДТП)."""
+    period_input = page.locator(SEL_PERIOD_INPUT)
+    if await period_input.count() == 0:
+        return False
+    value = _txt(await period_input.input_value())
+    return f"{start:%d.%m.%Y}" in value and f"{end:%d.%m.%Y}" in value
+
 
-            if pg == MAX_PAGES:
+async def _page_size_applied(page, page_size: str) -> bool:
+    return page_size in _txt(await page.locator(SEL_LIMIT_BTN).inner_text()).split()
+
+
+async def _warm_table_confirmed(page, js: str, arg: list, what: str) -> bool:
+    """Фильтр восстановился — ждём, что и таблица его отражает; иначе настройка через UI."""
+    try:
+        await _wait_table_ready(page, js, arg, what)
+    except RuntimeError:
+        print(f"[INFO] тёплый старт: таблица не подтвердила {what}, настраиваем через UI")
+        return False
+    return True
+
+
+# ===================== main =====================
+async def scrape_period(browser, start: date, end: date) -> Columns:
+    """Полный проход по одному подпериоду в отдельном контексте браузера."""
+    columns: Columns = {}
+    period = f"{start:%d.%m.%Y}-{end:%d.%m.%Y}"
+    state_path = STATE_FILE.format(start=start, end=end)
+    warm = os.path.exists(state_path)
+
+    context = await browser.new_context(
+        viewport={"width": 1440, "height": 900},
+        locale="ru-RU",
+        java_script_enabled=True,
+        service_workers="block",
+        storage_state=state_path if warm else None,
+    )
+    try:
+        await context.route("**/*", _block_heavy_resources)
+        page = await context.new_page()
+        page.set_default_navigation_timeout(NAV_TIMEOUT_MS)
+        page.set_default_timeout(ACTION_TIMEOUT_MS)
+        _cache_locators(page)
+
+        await page.goto(URL, wait_until="domcontentloaded")
+        await page._skdf["rows"].first.wait_for(state="visible")
+
+        # 1) Выбор всех полей (идемпотентно: чекбокс кликается, только если снят)
+        await click_select_all_fields(page)
+
+        # 2) Период через календарь (исправлено) — на тёплом старте пропускается, только если
+        #    фильтр восстановился и таблица это подтверждает
+        if not (
+            warm
+            and await _period_applied(page, start, end)
+            and await _warm_table_confirmed(
+                page, _JS_ROWS_IN_PERIOD, _rows_in_period_arg(start, end), f"период {period}"
+            )
+        ):
+            await set_period_range_via_calendar(page, start, end)
+
+        # 3) Показывать по -> 160 (так же)
+        if not (
+            warm
+            and await _page_size_applied(page, PAGE_SIZE)
+            and await _warm_table_confirmed(
+                page, _JS_PAGE_SIZE_APPLIED, _page_size_arg(PAGE_SIZE), f"размер страницы {PAGE_SIZE}"
+            )
+        ):
+            await set_page_size(page, PAGE_SIZE)
+
+        # сюда доходим только после подтверждённой настройки: UI-шаги бросают исключение, если
+        # таблица не обновилась, а пропущенные — проверены _warm_table_confirmed; иначе неудачная
+        # настройка стала бы тёплым стартом
+        await context.storage_state(path=state_path)
+
+        # 4) Сбор страниц
+        for pg in range(1, MAX_PAGES_PER_PERIOD + 1):
+            page_columns = await parse_table(page)
+            n = _num_rows(page_columns)
+            page_columns["_page"] = [str(pg)] * n
+            page_columns["_period"] = [period] * n
+            _extend_columns(columns, page_columns)
+
+            print(f"[OK] {period} page {pg}: +{n} rows (total={_num_rows(columns)})")
+
+            if pg == MAX_PAGES_PER_PERIOD:
+                if await has_next_page(page):
+                    print(
+                        f"[WARN] {period}: достигнут MAX_PAGES_PER_PERIOD={MAX_PAGES_PER_PERIOD}, "
+                        f"остальные строки подпериода не собраны — в данных будет пропуск внутри периода."
+                    )
                 break
 
-            if not next_page(page):
-                print("[INFO] Next page not available / table not changed. Stop.")
+            if not await next_page(page):
+                print(f"[INFO] {period}: next page not available / table not changed. Stop.")
                 break
+    finally:
+        await context.close()
 
-        browser.close()
+    return columns
+
+
+class ScraperPool:
+    """
+    Долгоживущий браузер для многократных scrape() в одном процессе (например, по месяцам).
+
+    - size — на сколько подпериодов scrape() делит период и сколько из них собирается
+      одновременно (общий лимит на все вызовы scrape);
+    - после max_uses контекстов браузер перезапускается, чтобы не копить утечки памяти Chromium;
+      старый закрывается, когда его отпустит последний воркер.
+    Контексты создаются на каждый подпериод (это дёшево): storage_state для тёплого старта
+    задаётся только при создании контекста.
+    """
 
-    df = pd.DataFrame(all_rows)
-    df.to_csv(OUT_CSV, index=False, encoding="utf-8-sig")
-    df.to_excel(OUT_EXCEL, index=False)
-    print(f"[DONE] saved: {OUT_CSV} | rows={len(df)} | cols={len(df.columns)}")
+    def __init__(self, size: int = WORKERS, max_uses: int = BROWSER_MAX_USES) -> None:
+        self.size = size
+        self.max_uses = max_uses
+        self._pw = None
+        self._browser = None
+        self._uses = 0
+        self._active: Dict[object, int] = {}
+        self._slots = asyncio.Semaphore(size)
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "ScraperPool":
+        self._pw = await async_playwright().start()
+        try:
+            self._browser = await self._pw.chromium.launch(headless=HEADLESS)
+        except BaseException:
+            # __aexit__ при ошибке в __aenter__ не вызывается — драйвер останавливаем сами
+            await self._pw.stop()
+            raise
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        try:
+            for browser in [self._browser, *self._active]:
+                if browser is not None and browser.is_connected():
+                    await browser.close()
+        finally:
+            self._active.clear()
+            await self._pw.stop()
+
+    async def _acquire(self):
+        async with self._lock:
+            if self._uses >= self.max_uses or not self._browser.is_connected():
+                old = self._browser
+                self._browser = await self._pw.chromium.launch(headless=HEADLESS)
+                self._uses = 0
+                if not self._active.get(old) and old.is_connected():
+                    await old.close()
+            self._uses += 1
+            self._active[self._browser] = self._active.get(self._browser, 0) + 1
+            return self._browser
+
+    async def _release(self, browser) -> None:
+        async with self._lock:
+            self._active[browser] -= 1
+            if self._active[browser] == 0:
+                del self._active[browser]
+                if browser is not self._browser and browser.is_connected():
+                    await browser.close()
+
+    async def _scrape_period(self, start: date, end: date) -> Columns:
+        async with self._slots:
+            browser = await self._acquire()
+            try:
+                return await scrape_period(browser, start, end)
+            finally:
+                await self._release(browser)
+
+    async def scrape(self, start: date, end: date) -> pa.Table:
+        chunks = _split_period(start, end, self.size)
+        results = await asyncio.gather(*[self._scrape_period(s, e) for s, e in chunks])
+
+        columns: Columns = {}
+        for part in results:
+            _extend_columns(columns, part)
+        return pa.table(columns)
+
+
+async def main() -> None:
+    async with ScraperPool() as pool:
+        table = await pool.scrape(START_DATE, END_DATE)
+
+    _write_csv(table, OUT_CSV)
+    _write_excel(table, OUT_EXCEL)
+    print(f"[DONE] saved: {OUT_CSV} | rows={table.num_rows} | cols={table.num_columns}")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())